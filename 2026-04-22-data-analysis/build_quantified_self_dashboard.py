@@ -42,11 +42,19 @@ def local_hour(series):
     return series.dt.hour + series.dt.minute / 60.0
 
 
-def safe_quantile(series, q):
-    series = series.dropna()
-    if series.empty:
+def month_key(values):
+    dates = values.dt if isinstance(values, pd.Series) else values
+    keys = dates.year * 100 + dates.month
+    labels = {key: f"{int(key) // 100:04d}-{int(key) % 100:02d}" for key in keys.dropna().unique()}
+    return keys.map(labels)
+
+
+def safe_quantile(values, q):
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
         return np.nan
-    return float(series.quantile(q))
+    return float(np.quantile(values, q))
 
 
 def parse_hex(value):
@@ -63,7 +71,7 @@ def parse_hex(value):
 
 
 def blend_colors(colors):
-    if not colors:
+    if len(colors) == 0:
         return "#000000"
     arr = np.array(colors, dtype=float)
     mean = np.clip(np.round(arr.mean(axis=0)), 0, 255).astype(int)
@@ -71,11 +79,40 @@ def blend_colors(colors):
 
 
 def robust_zscore(series):
-    median = series.median()
-    mad = (series - median).abs().median()
-    if pd.isna(mad) or mad == 0:
+    centered = series.to_numpy(dtype=float, copy=True)
+    if np.isnan(centered).all():
+        return pd.Series(0.0, index=series.index)
+    centered -= np.nanmedian(centered)
+    mad = np.nanmedian(np.abs(centered))
+    if mad == 0:
         return pd.Series(0.0, index=series.index)
-    return 0.6745 * (series - median) / mad
+    centered *= 0.6745 / mad
+    return pd.Series(centered, index=series.index)
+
+
+def pearson(a, b):
+    mask = ~(np.isnan(a) | np.isnan(b))
+    if mask.sum() < 2:
+        return np.nan
+    a = a[mask] - a[mask].mean()
+    b = b[mask] - b[mask].mean()
+    denom = np.sqrt((a * a).sum() * (b * b).sum())
+    if denom == 0:
+        return np.nan
+    return float((a * b).sum() / denom)
+
+
+def lagged_pearson(a, b, lag):
+    if lag >= 0:
+        return pearson(a[: len(a) - lag], b[lag:])
+    return pearson(a[-lag:], b[: len(b) + lag])
+
+
+def grouped_quantiles(grouped, spec):
+    columns = sorted({column for column, _ in spec.values()})
+    quantiles = sorted({q for _, q in spec.values()})
+    table = grouped[columns].quantile(quantiles).unstack()
+    return pd.DataFrame({name: table[(column, q)] for name, (column, q) in spec.items()})
 
 
 def json_ready_records(frame):
@@ -101,32 +138,40 @@ def load_weather_frame():
         nonexistent="shift_forward",
     )
     weather["local_date"] = weather["local_ts"].dt.date
-    weather["month"] = weather["local_ts"].dt.strftime("%Y-%m")
+    weather["month"] = month_key(weather["local_ts"])
     weather["outdoor_temp_f"] = weather["temperature_2m"] * 9 / 5 + 32
     weather = weather.drop(columns=["time"]).set_index("local_ts")
     return weather, weather_obj
 
 
-def metric_summary(frame, column):
+def metric_summary(frame, column, parsed=None):
     series = frame[column]
-    numeric = pd.to_numeric(series, errors="coerce")
-    examples = [str(v) for v in series.dropna().head(3).tolist()]
+    present = series[series.notna()]
+    examples = [str(v) for v in present.head(3).tolist()]
     summary = {
         "name": column,
-        "null_rate": round(float(series.isna().mean() * 100), 3),
-        "unique_nonnull": int(series.nunique(dropna=True)),
+        "null_rate": round(float((len(series) - len(present)) / len(series) * 100), 3),
+        "unique_nonnull": int(present.nunique()),
         "examples": examples,
     }
     if column == "gw_timestamp":
-        dt = pd.to_datetime(series, utc=True, errors="coerce")
+        if parsed is None:
+            parsed = pd.to_datetime(present, utc=True, errors="coerce")
+        dt = parsed.dropna()
         summary.update(
             {
                 "type": "datetime",
-                "date_min": dt.min().isoformat() if dt.notna().any() else None,
-                "date_max": dt.max().isoformat() if dt.notna().any() else None,
+                "date_min": dt.min().isoformat() if len(dt) else None,
+                "date_max": dt.max().isoformat() if len(dt) else None,
             }
         )
-    elif numeric.notna().sum() > 0 and numeric.notna().sum() >= max(3, len(series) * 0.5):
+        return summary
+    if pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present):
+        numeric = present.to_numpy(dtype=float)
+    else:
+        numeric = pd.to_numeric(present, errors="coerce").to_numpy(dtype=float)
+    numeric = numeric[~np.isnan(numeric)]
+    if len(numeric) > 0 and len(numeric) >= max(3, len(series) * 0.5):
         summary.update(
             {
                 "type": "numeric",
@@ -146,7 +191,7 @@ def build_rollups():
     raw["local_ts"] = raw["gw_ts_utc"].dt.tz_convert(TZ_NAME)
     raw["local_date"] = raw["local_ts"].dt.date
     raw["local_hour"] = local_hour(raw["local_ts"])
-    raw["local_month"] = raw["local_ts"].dt.strftime("%Y-%m")
+    raw["local_month"] = month_key(raw["local_ts"])
 
     numeric_columns = [
         "timestamp_monotonic",
@@ -160,18 +205,20 @@ def build_rollups():
     for col in numeric_columns:
         raw[col] = pd.to_numeric(raw[col], errors="coerce")
 
-    schema = [metric_summary(raw, col) for col in raw.columns[:9]]
+    parsed_columns = {"gw_timestamp": raw["gw_ts_utc"]}
+    schema = [metric_summary(raw, col, parsed_columns.get(col)) for col in raw.columns[:9]]
 
-    cleaned = raw.copy()
+    source_rows = int(len(raw))
     dropped_counts = {
-        "invalid_gw_timestamp": int(cleaned["gw_ts_utc"].isna().sum()),
-        "pressure_lt_900_hpa": int((cleaned["pressure"] < 900).sum()),
-        "light_gt_70000_clear_counts": int((cleaned["light"] > 70000).sum()),
+        "invalid_gw_timestamp": int(raw["gw_ts_utc"].isna().sum()),
+        "pressure_lt_900_hpa": int((raw["pressure"] < 900).sum()),
+        "light_gt_70000_clear_counts": int((raw["light"] > 70000).sum()),
         "corrupt_monotonic_non_numeric": int(raw["timestamp_monotonic"].isna().sum()),
     }
-    cleaned.loc[cleaned["pressure"] < 900, "pressure"] = np.nan
-    cleaned.loc[cleaned["light"] > 70000, "light"] = np.nan
-    cleaned = cleaned[cleaned["gw_ts_utc"].notna()].copy()
+    raw.loc[raw["pressure"] < 900, "pressure"] = np.nan
+    raw.loc[raw["light"] > 70000, "light"] = np.nan
+    cleaned = raw[raw["gw_ts_utc"].notna()].copy()
+    del raw
     cleaned = cleaned.sort_values("local_ts").reset_index(drop=True)
     cleaned["gw_gap_s"] = cleaned["gw_ts_utc"].diff().dt.total_seconds()
     cleaned["mono_gap_s"] = cleaned["timestamp_monotonic"].diff()
@@ -184,23 +231,26 @@ def build_rollups():
     reboot_rows["local_ts"] = reboot_rows["local_ts"].astype(str)
 
     headline_shift_source = []
-    for local_date, group in cleaned.groupby("local_date"):
-        group = group[group["light"].notna()]
-        if len(group) < 50 or safe_quantile(group["light"], 0.95) < 100:
+    light_values = cleaned["light"].to_numpy(dtype=float)
+    hour_values = cleaned["local_hour"].to_numpy(dtype=float)
+    ts_values = cleaned["local_ts"].array
+    for local_date, rows in cleaned.groupby("local_date").indices.items():
+        rows = rows[~np.isnan(light_values[rows])]
+        light = light_values[rows]
+        if len(rows) < 50 or safe_quantile(light, 0.95) < 100:
             continue
-        peak_row = group.loc[group["light"].idxmax()]
-        p90 = group["light"].quantile(0.9)
-        bright = group[group["light"] >= p90]
+        peak = int(np.argmax(light))
+        bright = rows[light >= np.quantile(light, 0.9)]
         headline_shift_source.append(
             {
                 "date": str(local_date),
                 "month": str(pd.Period(local_date, freq="M")),
-                "peak_hour": float(peak_row["local_hour"]),
-                "peak_light": float(peak_row["light"]),
-                "bright_start": float(local_hour(pd.Series([bright["local_ts"].min()])).iloc[0]),
-                "bright_end": float(local_hour(pd.Series([bright["local_ts"].max()])).iloc[0]),
+                "peak_hour": float(hour_values[rows[peak]]),
+                "peak_light": float(light[peak]),
+                "bright_start": float(hour_values[bright[0]]),
+                "bright_end": float(hour_values[bright[-1]]),
                 "bright_span_h": float(
-                    (bright["local_ts"].max() - bright["local_ts"].min()).total_seconds() / 3600.0
+                    (ts_values[bright[-1]] - ts_values[bright[0]]).total_seconds() / 3600.0
                 ),
             }
         )
@@ -217,15 +267,18 @@ def build_rollups():
     )
     peak_shift_hours = float(monthly_light["peak_hour"].max() - monthly_light["peak_hour"].min())
 
+    day_groups = cleaned.groupby("local_date")
     byday = (
-        cleaned.groupby("local_date")
-        .agg(
-            light_p75=("light", lambda s: s.quantile(0.75)),
-            sound_p75=("sound_level", lambda s: s.quantile(0.75)),
-            light_p90=("light", lambda s: s.quantile(0.9)),
-            sound_p90=("sound_level", lambda s: s.quantile(0.9)),
-            rows=("gw_timestamp", "size"),
+        grouped_quantiles(
+            day_groups,
+            {
+                "light_p75": ("light", 0.75),
+                "sound_p75": ("sound_level", 0.75),
+                "light_p90": ("light", 0.9),
+                "sound_p90": ("sound_level", 0.9),
+            },
         )
+        .assign(rows=day_groups.size())
         .reset_index()
     )
     byday["light_rank"] = byday["light_p75"].rank(pct=True)
@@ -253,41 +306,35 @@ def build_rollups():
         )
         .reset_index(names=["activity_class", "hour"])
     )
-    activity_profile = []
-    for hour in range(24):
-        row = {"hour": hour}
-        for label in ["quiet", "active"]:
-            subset = daily_profiles[
-                (daily_profiles["activity_class"] == label) & (daily_profiles["hour"] == hour)
-            ]
-            if subset.empty:
-                row[f"{label}_light"] = None
-                row[f"{label}_sound"] = None
-                row[f"{label}_temp"] = None
-            else:
-                row[f"{label}_light"] = float(subset["light_median"].iloc[0])
-                row[f"{label}_sound"] = float(subset["sound_median"].iloc[0])
-                row[f"{label}_temp"] = float(subset["temp_median"].iloc[0])
-        activity_profile.append(row)
-
-    hourly = (
-        cleaned.set_index("local_ts")
-        .resample("1h")
-        .agg(
-            light=("light", "median"),
-            temp=("temperature_sht", "median"),
-            humidity=("humidity", "median"),
-            pressure=("pressure", "median"),
-            sound=("sound_level", lambda s: s.quantile(0.95)),
-            rows=("gw_timestamp", "size"),
-        )
+    profile_metrics = [("light", "light_median"), ("sound", "sound_median"), ("temp", "temp_median")]
+    profile_labels = ["quiet", "active"]
+    profile_grid = daily_profiles.pivot(index="hour", columns="activity_class").reindex(
+        index=range(24),
+        columns=pd.MultiIndex.from_tuples(
+            [(column, label) for label in profile_labels for _, column in profile_metrics]
+        ),
     )
+    profile_keys = [f"{label}_{name}" for label in profile_labels for name, _ in profile_metrics]
+    activity_profile = [
+        {"hour": hour, **{key: None if pd.isna(value) else value for key, value in zip(profile_keys, values)}}
+        for hour, values in enumerate(profile_grid.to_numpy(dtype=float).tolist())
+    ]
+
+    hourly_bins = cleaned.resample("1h", on="local_ts")
+    hourly = hourly_bins.agg(
+        light=("light", "median"),
+        temp=("temperature_sht", "median"),
+        humidity=("humidity", "median"),
+        pressure=("pressure", "median"),
+        rows=("gw_timestamp", "size"),
+    )
+    hourly.insert(4, "sound", hourly_bins["sound_level"].quantile(0.95))
     hourly_weather = hourly.join(weather, how="inner") if weather is not None else hourly.copy()
     lag_results = []
-    light_norm = (hourly["light"] - hourly["light"].mean()) / hourly["light"].std()
-    temp_norm = (hourly["temp"] - hourly["temp"].mean()) / hourly["temp"].std()
+    light_values = hourly["light"].to_numpy(dtype=float)
+    temp_values = hourly["temp"].to_numpy(dtype=float)
     for lag in range(-12, 13):
-        corr = light_norm.corr(temp_norm.shift(-lag))
+        corr = lagged_pearson(light_values, temp_values, lag)
         lag_results.append({"lag_hours": lag, "correlation": None if pd.isna(corr) else float(corr)})
     best_positive_lag = max(
         [row for row in lag_results if row["lag_hours"] >= 0 and row["correlation"] is not None],
@@ -297,15 +344,10 @@ def build_rollups():
     weather_temp_corr = None
     best_outdoor_lag = None
     if weather is not None:
-        outdoor_norm = (
-            (hourly_weather["outdoor_temp_f"] - hourly_weather["outdoor_temp_f"].mean())
-            / hourly_weather["outdoor_temp_f"].std()
-        )
-        indoor_norm = (
-            (hourly_weather["temp"] - hourly_weather["temp"].mean()) / hourly_weather["temp"].std()
-        )
+        outdoor_values = hourly_weather["outdoor_temp_f"].to_numpy(dtype=float)
+        indoor_values = hourly_weather["temp"].to_numpy(dtype=float)
         for lag in range(-24, 25, 2):
-            corr = outdoor_norm.corr(indoor_norm.shift(-lag))
+            corr = lagged_pearson(outdoor_values, indoor_values, lag)
             outdoor_lag_results.append(
                 {"lag_hours": lag, "correlation": None if pd.isna(corr) else float(corr)}
             )
@@ -323,12 +365,17 @@ def build_rollups():
 
     color_rows = []
     color_frame = cleaned[cleaned["color_hex"].notna()].copy()
-    rgb_values = color_frame["color_hex"].apply(parse_hex)
-    color_frame = color_frame[rgb_values.notna()].copy()
-    color_frame["rgb"] = list(rgb_values[rgb_values.notna()])
-    color_frame["r"] = color_frame["rgb"].str[0]
-    color_frame["g"] = color_frame["rgb"].str[1]
-    color_frame["b"] = color_frame["rgb"].str[2]
+    hex_codes, hex_uniques = pd.factorize(color_frame["color_hex"])
+    rgb_table = np.array(
+        [parse_hex(value) or (-1, -1, -1) for value in hex_uniques], dtype=np.int64
+    ).reshape(-1, 3)
+    rgb = rgb_table[hex_codes]
+    rgb_valid = rgb[:, 0] >= 0
+    color_frame = color_frame[rgb_valid].copy()
+    rgb = rgb[rgb_valid]
+    color_frame["r"] = rgb[:, 0]
+    color_frame["g"] = rgb[:, 1]
+    color_frame["b"] = rgb[:, 2]
     color_frame["brightness"] = (color_frame["r"] + color_frame["g"] + color_frame["b"]) / 3.0
     color_frame["warm_cool_delta"] = color_frame["r"] - color_frame["b"]
     color_frame["color_mode"] = np.select(
@@ -343,10 +390,11 @@ def build_rollups():
     monthly_color_modes = (
         color_frame.groupby(["local_month", "color_mode"]).size().unstack(fill_value=0).reset_index()
     )
-    for _, row in monthly_color_modes.iterrows():
-        total = int(row[["dark", "warm", "cool", "neutral"]].sum())
-        swatches = color_frame[color_frame["local_month"] == row["local_month"]]
-        dominant = blend_colors(swatches["rgb"].head(200).tolist())
+    swatches_by_month = color_frame.set_index("local_month")
+    for row in monthly_color_modes.to_dict(orient="records"):
+        total = int(sum(row[mode] for mode in ["dark", "warm", "cool", "neutral"]))
+        swatches = swatches_by_month.loc[[row["local_month"]]]
+        dominant = blend_colors(swatches[["r", "g", "b"]].head(200).to_numpy())
         color_rows.append(
             {
                 "month": row["local_month"],
@@ -367,24 +415,25 @@ def build_rollups():
         + cleaned["dry_discomfort"] * 1.0
         + cleaned["noise_discomfort"] * 0.03
     )
-    discomfort_by_hour = (
-        cleaned.groupby(cleaned["local_ts"].dt.hour)
-        .agg(
-            discomfort_p95=("discomfort", lambda s: s.quantile(0.95)),
-            temperature_p95=("temperature_sht", lambda s: s.quantile(0.95)),
-            humidity_p05=("humidity", lambda s: s.quantile(0.05)),
-            sound_p95=("sound_level", lambda s: s.quantile(0.95)),
-        )
-        .reset_index(names=["hour"])
-    )
+    discomfort_by_hour = grouped_quantiles(
+        cleaned.groupby(cleaned["local_ts"].dt.hour),
+        {
+            "discomfort_p95": ("discomfort", 0.95),
+            "temperature_p95": ("temperature_sht", 0.95),
+            "humidity_p05": ("humidity", 0.05),
+            "sound_p95": ("sound_level", 0.95),
+        },
+    ).reset_index(names=["hour"])
+    day_groups = cleaned.groupby("local_date")
     discomfort_days = (
-        cleaned.groupby("local_date")
-        .agg(
-            discomfort_p95=("discomfort", lambda s: s.quantile(0.95)),
-            temp_max=("temperature_sht", "max"),
-            humidity_min=("humidity", "min"),
-            sound_p95=("sound_level", lambda s: s.quantile(0.95)),
+        grouped_quantiles(
+            day_groups,
+            {"discomfort_p95": ("discomfort", 0.95), "sound_p95": ("sound_level", 0.95)},
         )
+        .assign(
+            temp_max=day_groups["temperature_sht"].max(),
+            humidity_min=day_groups["humidity"].min(),
+        )[["discomfort_p95", "temp_max", "humidity_min", "sound_p95"]]
         .reset_index()
         .sort_values("discomfort_p95", ascending=False)
         .head(8)
@@ -396,15 +445,16 @@ def build_rollups():
     anomaly["pressure_rz"] = robust_zscore(anomaly["pressure"])
     anomaly["light_rz"] = robust_zscore(anomaly["light"])
     anomaly["sound_rz"] = robust_zscore(anomaly["sound"])
-    anomaly["anomaly_score"] = anomaly[
-        ["temp_rz", "humidity_rz", "pressure_rz", "light_rz", "sound_rz"]
-    ].abs().sum(axis=1)
+    anomaly["anomaly_score"] = np.nansum(
+        np.abs(anomaly[["temp_rz", "humidity_rz", "pressure_rz", "light_rz", "sound_rz"]].to_numpy()),
+        axis=1,
+    )
     threshold = float(anomaly["anomaly_score"].quantile(0.995))
     anomaly["is_event"] = anomaly["anomaly_score"] >= threshold
 
     episodes = []
     current = None
-    for timestamp, row in anomaly.iterrows():
+    for timestamp, row in zip(anomaly.index, anomaly.to_dict(orient="records")):
         if row["is_event"]:
             if current is None:
                 current = {
@@ -479,7 +529,7 @@ def build_rollups():
     anomaly_events = anomaly_events[:10]
 
     routine = (
-        hourly.assign(month=hourly.index.strftime("%Y-%m"))
+        hourly.assign(month=month_key(hourly.index))
         .groupby("month")
         .agg(
             active_hours_per_day=("light", lambda s: float((((s > 300) | (hourly.loc[s.index, "sound"] > 20)).mean()) * 24)),
@@ -495,7 +545,7 @@ def build_rollups():
     monthly_coupling = pd.DataFrame()
     if weather is not None:
         monthly_coupling = (
-            hourly_weather.assign(month=hourly_weather.index.strftime("%Y-%m"))
+            hourly_weather.assign(month=month_key(hourly_weather.index))
             .groupby("month")
             .agg(
                 indoor_temp_f=("temp", "median"),
@@ -536,15 +586,16 @@ def build_rollups():
             .reset_index()
         )
         rainy_lookup = {
-            bool(row["rainy"]): row for _, row in rainy_medians.iterrows()
+            bool(row["rainy"]): row for row in rainy_medians.to_dict(orient="records")
         }
         weather_compare = {
             "merged_hours": int(len(hourly_weather)),
-            "indoor_outdoor_temp_corr": float(
-                hourly_weather[["temp", "outdoor_temp_f"]].corr().iloc[0, 1]
+            "indoor_outdoor_temp_corr": pearson(
+                indoor_values, outdoor_values
             ),
-            "indoor_outdoor_pressure_corr": float(
-                hourly_weather[["pressure", "pressure_msl"]].corr().iloc[0, 1]
+            "indoor_outdoor_pressure_corr": pearson(
+                hourly_weather["pressure"].to_numpy(dtype=float),
+                hourly_weather["pressure_msl"].to_numpy(dtype=float),
             ),
             "pressure_gap_median_hpa": float(
                 (hourly_weather["pressure"] - hourly_weather["pressure_msl"]).median()
@@ -566,8 +617,7 @@ def build_rollups():
         }
 
     daily_pressure = (
-        cleaned.set_index("local_ts")
-        .resample("1D")
+        cleaned.resample("1D", on="local_ts")
         .agg(
             pressure=("pressure", "median"),
             temp=("temperature_sht", "median"),
@@ -578,11 +628,13 @@ def build_rollups():
         .dropna(subset=["pressure"])
         .reset_index()
     )
-    pressure_corr = daily_pressure[["pressure", "temp", "humidity", "light", "sound"]].corr()[
-        "pressure"
-    ].to_dict()
+    daily_pressure_values = daily_pressure["pressure"].to_numpy(dtype=float)
+    pressure_corr = {
+        column: pearson(daily_pressure_values, daily_pressure[column].to_numpy(dtype=float))
+        for column in ["pressure", "temp", "humidity", "light", "sound"]
+    }
     pressure_monthly = (
-        daily_pressure.assign(month=daily_pressure["local_ts"].dt.strftime("%Y-%m"))
+        daily_pressure.assign(month=month_key(daily_pressure["local_ts"]))
         .groupby("month")
         .agg(pressure=("pressure", "median"))
         .reset_index()
@@ -626,7 +678,7 @@ def build_rollups():
         "provenance": {
             "source_file": str(INPUT_CSV),
             "weather_file": str(WEATHER_JSON) if weather is not None else None,
-            "source_rows": int(len(raw)),
+            "source_rows": source_rows,
             "rows_after_timestamp_cleaning": int(len(cleaned)),
             "date_range_utc": {
                 "start": cleaned["gw_ts_utc"].min().isoformat(),
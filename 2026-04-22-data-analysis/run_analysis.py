@@ -1,11 +1,11 @@
 import pandas as pd
-import numpy as np
 import json
-from datetime import datetime
 
 file_path = 'clue_full_history_20260422_214756.csv'
+# Only the columns the questions below touch; the rest are never parsed
+columns = ['gw_timestamp', 'temperature_sht', 'pressure', 'light', 'sound_level', 'color_hex']
 
-df = pd.read_csv(file_path, low_memory=False)
+df = pd.read_csv(file_path, usecols=columns, low_memory=False)
 df['gw_timestamp'] = pd.to_datetime(df['gw_timestamp'])
 df = df.dropna(subset=['gw_timestamp'])
 
@@ -22,12 +22,6 @@ df['date'] = df['local_time'].dt.date
 df = df[df['pressure'] > 500] 
 df = df[df['light'] < 1000000] 
 
-def to_native(obj):
-    if isinstance(obj, np.integer): return int(obj)
-    if isinstance(obj, np.floating): return float(obj)
-    if isinstance(obj, (datetime, pd.Timestamp)): return obj.isoformat()
-    return obj
-
 # Q1: Workday Pulse
 workday_pulse = df.groupby('hour').agg({
     'sound_level': ['median', 'std'],
@@ -62,11 +56,11 @@ def get_top_vibrant_color(series):
 monthly_colors = df.groupby('month')['color_hex'].apply(get_top_vibrant_color).reset_index()
 
 results = {
-    "workday_pulse": workday_pulse.map(to_native).to_dict(orient='records'),
-    "seasonal_light": seasonal_light.map(to_native).to_dict(orient='records'),
-    "thermal_profile": thermal_profile.map(to_native).to_dict(orient='records'),
-    "sound_floor": sound_floor.map(to_native).to_dict(orient='records'),
-    "monthly_colors": monthly_colors.map(to_native).to_dict(orient='records'),
+    "workday_pulse": workday_pulse.to_dict(orient='records'),
+    "seasonal_light": seasonal_light.to_dict(orient='records'),
+    "thermal_profile": thermal_profile.to_dict(orient='records'),
+    "sound_floor": sound_floor.to_dict(orient='records'),
+    "monthly_colors": monthly_colors.to_dict(orient='records'),
     "meta": {
         "row_count": int(len(df)),
         "start_date": df['local_time'].min().isoformat(),
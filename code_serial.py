@@ -54,9 +54,17 @@ except ImportError:
     print("BMP280 library not found.")
     adafruit_bmp280 = None
 
+try:
+    from ulab import numpy as ulab_np     # C-level array math for the mic RMS
+except ImportError:
+    print("ulab not found, using Python loop for sound level.")
+    ulab_np = None
+
 # --- Configuration ---
 # Default interval, can be changed by gateway command
 DATA_CAPTURE_INTERVAL_SECONDS = 30  # Start with 30 seconds default
+SERIAL_POLL_INTERVAL_SECONDS = 0.25 # Longest idle sleep before checking for commands again
+TWO_DIGITS = tuple("%02d" % i for i in range(100)) # Zero-padded 00-99 for timestamp building
 # BUFFER_FILE = "/data_buffer.jsonl" # REMOVED
 # MAX_BUFFER_SIZE_BYTES = 1 * 1024 * 1024 # REMOVED
 
@@ -149,28 +157,38 @@ except Exception as e:
 
 # --- Helper Functions ---
 
-def scale_clamp(value, sensor_max, target_max=255):
-    """Scales sensor value to 0-target_max and clamps."""
-    try:
-        scaled = int(value / sensor_max * target_max)
-        return max(0, min(target_max, scaled)) # Clamp between 0 and target_max
-    except (TypeError, ValueError):
-        return 0 # Return 0 if value is invalid
+RGB_SENSOR_MAX = 786 # MODIFIED from 4096 based on observed raw values
+
+def scale_channel(value):
+    """Scales a raw color channel to 0-255 and clamps (integer math only)."""
+    scaled = value * 255 // RGB_SENSOR_MAX
+    return 0 if scaled < 0 else 255 if scaled > 255 else scaled
 
 def rgb_to_hex(r, g, b):
     """Converts raw RGB sensor values to a hex color string."""
-    assumed_max = 786 # MODIFIED from 4096 based on observed raw values
-    r_scaled = scale_clamp(r, assumed_max)
-    g_scaled = scale_clamp(g, assumed_max)
-    b_scaled = scale_clamp(b, assumed_max)
-    return f"#{r_scaled:02X}{g_scaled:02X}{b_scaled:02X}"
+    try:
+        return "#%02X%02X%02X" % (scale_channel(r), scale_channel(g), scale_channel(b))
+    except TypeError:
+        return "#000000" # Invalid reading
 
-def get_sound_level(num_samples=160):
+INF = float("inf")
+
+def round_reading(value):
+    """Rounds a float reading to 2 places; None for NaN/Inf (round() would pass them through)."""
+    if value != value or value in (INF, -INF):
+        return None
+    return round(value, 2) # Adjust precision if needed
+
+def get_sound_level():
     """Samples the microphone and returns the RMS sound level."""
     if not mic or not samples:
         return None
     try:
-        mic.record(samples, len(samples))
+        num_samples = len(samples)
+        mic.record(samples, num_samples)
+        if ulab_np:
+            centered = ulab_np.array(samples, dtype=ulab_np.float) - 32768
+            return round(math.sqrt(ulab_np.mean(centered * centered)))
         sum_sq = 0
         for s in samples:
             sample_signed = s - 32768 # Convert unsigned 16-bit to signed
@@ -191,14 +209,15 @@ def get_sensor_data():
     # Format RTC time as ISO 8601 string if RTC is plausible (year > 2000)
     try:
         if rtc_time.tm_year > 2000:
-             data["timestamp_iso"] = f"{rtc_time.tm_year:04d}-{rtc_time.tm_mon:02d}-{rtc_time.tm_mday:02d}T{rtc_time.tm_hour:02d}:{rtc_time.tm_min:02d}:{rtc_time.tm_sec:02d}Z"
+             data["timestamp_iso"] = (str(rtc_time.tm_year) + "-" + TWO_DIGITS[rtc_time.tm_mon] + "-" + TWO_DIGITS[rtc_time.tm_mday]
+                                      + "T" + TWO_DIGITS[rtc_time.tm_hour] + ":" + TWO_DIGITS[rtc_time.tm_min] + ":" + TWO_DIGITS[rtc_time.tm_sec] + "Z")
         else:
              data["timestamp_iso"] = None # Indicate RTC not set reliably
     except Exception as e:
         print(f"Error formatting RTC time: {e}")
         data["timestamp_iso"] = None
 
-    data["timestamp_monotonic"] = monotonic_time # Keep monotonic time
+    data["timestamp_monotonic"] = round_reading(monotonic_time) # Keep monotonic time
 
     # --- Read only the required sensors ---
 
@@ -215,15 +234,15 @@ def get_sensor_data():
     # Read SHT31D for Temperature and Humidity
     if sht31d:
         try:
-            data["humidity"] = sht31d.relative_humidity
-            data["temperature_sht"] = sht31d.temperature
+            data["humidity"] = round_reading(sht31d.relative_humidity)
+            data["temperature_sht"] = round_reading(sht31d.temperature)
         except Exception as e:
             print(f"Error reading SHT31D: {e}")
 
     # Read BMP280 for Pressure
     if bmp280:
         try:
-            data["pressure"] = bmp280.pressure
+            data["pressure"] = round_reading(bmp280.pressure)
         except Exception as e:
             print(f"Error reading BMP280: {e}")
 
@@ -236,67 +255,77 @@ def get_sensor_data():
     # if lis3mdl:
     #     try: ... # Skip LIS3MDL
 
-    # Round floats for the values we did collect
-    for key, value in data.items():
-        if isinstance(value, float):
-            try:
-                data[key] = round(value, 2) # Adjust precision if needed
-            except OverflowError:
-                 data[key] = None # Handle potential NaN/Inf values
-                 print(f"Warning: OverflowError rounding {key}. Setting to None.")
-
     return data
 
+# Fixed key order for the JSON line sent to the gateway; missing readings are sent as null
+SENSOR_JSON_KEYS = ("timestamp_iso", "timestamp_monotonic", "color_hex", "light",
+                    "humidity", "temperature_sht", "pressure", "sound_level")
+SENSOR_JSON_TEMPLATE = "{{" + ",".join('"' + key + '":{}' for key in SENSOR_JSON_KEYS) + "}}"
+
+def json_value(value):
+    """Formats one sensor value as a JSON literal (strings here never need escaping)."""
+    if value is None or value != value or value in (INF, -INF): # None, NaN or Inf have no JSON literal
+        return "null"
+    if isinstance(value, str):
+        return '"' + value + '"'
+    return str(value)
+
+def sensor_data_to_json(data):
+    """Serializes a get_sensor_data() dict using the fixed template instead of json.dumps."""
+    return SENSOR_JSON_TEMPLATE.format(*[json_value(data.get(key)) for key in SENSOR_JSON_KEYS])
+
 # --- Function to handle incoming commands ---
-serial_buffer = ""
-def handle_serial_commands():
+serial_buffer = "" # Command text still waiting for its newline
+def handle_serial_commands(num_bytes):
     global DATA_CAPTURE_INTERVAL_SECONDS, serial_buffer
-    # Check if there's any data waiting in the USB CDC serial buffer
-    num_bytes = supervisor.runtime.serial_bytes_available
-    if num_bytes > 0:
-        # print(f"-- DBG: Serial bytes available: {num_bytes}")
-        # Read only the available bytes
-        new_data = sys.stdin.read(num_bytes)
-        # print(f"-- DBG: Read data: {new_data!r}") # Use repr to see control chars
-        if new_data:
-             serial_buffer += new_data
-
-        # print("-- DBG: Processing serial buffer loop...")
-        # Process complete lines (ending in newline)
-        while '\n' in serial_buffer:
-            line, serial_buffer = serial_buffer.split('\n', 1)
-            line = line.strip()
-            # print(f"-- DBG: Processing line: {line!r}")
-            if not line:
-                # print("-- DBG: Skipping empty line.")
-                continue
-            try:
-                command_data = json.loads(line)
-                if isinstance(command_data, dict):
-                    command = command_data.get("command")
-                    value = command_data.get("value")
-                    # print(f"-- DBG: Parsed command: {command}, value: {value}")
-
-                    if command == "set_interval" and value is not None:
-                        try:
-                            new_interval = int(value)
-                            if new_interval >= 1: # Basic validation
-                                DATA_CAPTURE_INTERVAL_SECONDS = new_interval
-                                print(f"COMMAND OK: Set data capture interval to {DATA_CAPTURE_INTERVAL_SECONDS} seconds")
-                            else:
-                                print(f"COMMAND ERR: Invalid interval value {new_interval}")
-                        except ValueError:
-                            print(f"COMMAND ERR: Interval value '{value}' is not a valid integer.")
-                    else:
-                         print(f"COMMAND ERR: Unknown or incomplete command: {command_data}")
-                # else:
-                    # print(f"-- DBG: Parsed JSON is not a dict: {command_data!r}")
-
-            except json.JSONDecodeError:
-                print(f"COMMAND ERR: Received non-JSON data: {line}")
-            except Exception as e:
-                 print(f"COMMAND ERR: Error processing command '{line}': {e}")
-        # print("-- DBG: Exiting serial buffer loop.")
+    # num_bytes is the USB CDC serial_bytes_available count, checked by the main loop
+    # print(f"-- DBG: Serial bytes available: {num_bytes}")
+    # Read only the available bytes
+    new_data = sys.stdin.read(num_bytes)
+    # print(f"-- DBG: Read data: {new_data!r}") # Use repr to see control chars
+    if new_data:
+         serial_buffer += new_data
+    # Complete lines are always consumed below, so a newline can only be in the new data
+    if not new_data or '\n' not in new_data:
+        return
+
+    # print("-- DBG: Processing serial buffer loop...")
+    # Split off all complete lines (ending in newline) in one pass; the trailing partial line stays buffered
+    lines = serial_buffer.split('\n')
+    serial_buffer = lines.pop()
+    for line in lines:
+        line = line.strip()
+        # print(f"-- DBG: Processing line: {line!r}")
+        if not line:
+            # print("-- DBG: Skipping empty line.")
+            continue
+        try:
+            command_data = json.loads(line)
+            if isinstance(command_data, dict):
+                command = command_data.get("command")
+                value = command_data.get("value")
+                # print(f"-- DBG: Parsed command: {command}, value: {value}")
+
+                if command == "set_interval" and value is not None:
+                    try:
+                        new_interval = int(value)
+                        if new_interval >= 1: # Basic validation
+                            DATA_CAPTURE_INTERVAL_SECONDS = new_interval
+                            print(f"COMMAND OK: Set data capture interval to {DATA_CAPTURE_INTERVAL_SECONDS} seconds")
+                        else:
+                            print(f"COMMAND ERR: Invalid interval value {new_interval}")
+                    except ValueError:
+                        print(f"COMMAND ERR: Interval value '{value}' is not a valid integer.")
+                else:
+                     print(f"COMMAND ERR: Unknown or incomplete command: {command_data}")
+            # else:
+                # print(f"-- DBG: Parsed JSON is not a dict: {command_data!r}")
+
+        except json.JSONDecodeError:
+            print(f"COMMAND ERR: Received non-JSON data: {line}")
+        except Exception as e:
+             print(f"COMMAND ERR: Error processing command '{line}': {e}")
+    # print("-- DBG: Exiting serial buffer loop.")
 
     # print("-- DBG: Exiting handle_serial_commands function.")
 
@@ -316,7 +345,9 @@ while True:
     # --- Check for commands frequently ---
     # print("-- DBG: Checking for serial commands...")
     try:
-        handle_serial_commands()
+        num_bytes = supervisor.runtime.serial_bytes_available
+        if num_bytes:
+            handle_serial_commands(num_bytes)
     except Exception as e_serial:
         print(f"ERROR in handle_serial_commands: {e_serial}") # Keep this error print
     # print("-- DBG: Finished checking serial commands.")
@@ -330,13 +361,15 @@ while True:
         # print(f"\nCapturing sensor data (Interval: {DATA_CAPTURE_INTERVAL_SECONDS}s)...") # <-- Commented out this line
         sensor_data = get_sensor_data()
         try:
-            json_string = json.dumps(sensor_data)
+            json_string = sensor_data_to_json(sensor_data)
             print(json_string)
         except Exception as e:
             print(f"Error converting/printing data to JSON: {e}")
     # else:
         # print("-- DBG: Not time to capture yet.")
 
-    # Small delay
+    # Sleep until the next capture is due, waking periodically for commands
     # print("-- DBG: Main loop sleep.")
-    time.sleep(0.1) # Restore original sleep time
\ No newline at end of file
+    time_to_capture = last_capture_time + DATA_CAPTURE_INTERVAL_SECONDS - time.monotonic()
+    if time_to_capture > 0:
+        time.sleep(min(SERIAL_POLL_INTERVAL_SECONDS, time_to_capture))
\ No newline at end of file
@@ -6,12 +6,17 @@ import serial.tools.list_ports
 import json
 import time
 import threading
+import queue
 import logging
 import os
 import sys
 from datetime import datetime, timezone, timedelta, MINYEAR
-from collections import deque
+from collections import deque, defaultdict
+import functools
+import contextlib
 import csv
+import itertools
+import shutil
 from pathlib import Path
 import configparser
 # --- Adafruit IO Imports --- (Re-enable import)
@@ -34,16 +39,56 @@ else:
 # Feed = None
 # RequestError = Exception
 # ThrottlingError = Exception
+if AIO_AVAILABLE:
+    import requests # Installed with adafruit-io
+
+    class SessionClient(Client):
+        """Adafruit IO client whose uploads reuse one keep-alive HTTP connection.
+
+        The stock Client calls requests.post() per request, paying a new TCP/TLS
+        handshake every time. Only _post is overridden since uploads are all we send;
+        it mirrors adafruit-io's Client._post (keep in sync) apart from using the session.
+        """
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._session = requests.Session()
+
+        def _post(self, path, data):
+            response = self._session.post(self._compose_url(path),
+                                          headers=self._headers({'X-AIO-Key': self.key,
+                                                                 'Content-Type': 'application/json'}),
+                                          proxies=self.proxies,
+                                          data=json.dumps(data))
+            self._last_response = response
+            self._handle_error(response)
+            return response.json()
+
+# Optional faster JSON codec for the per-sample path; stdlib json is used when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Constants ---
 APP_NAME = "ClueGatewayWebview"
-DATA_DIR = Path.home() / "Library" / "Application Support" / APP_NAME
+DATA_DIR = Path(os.environ.get("CLUE_DATA_DIR") or Path.home() / "Library" / "Application Support" / APP_NAME) # CLUE_DATA_DIR overrides (e.g. a scratch dir for test runs)
 DATA_FILE = DATA_DIR / "sensor_data.csv"
 CSV_FIELDNAMES = [
     'gw_timestamp', 'timestamp_monotonic', 'timestamp_iso',
     'temperature_sht', 'humidity', 'pressure', 'light', 'sound_level', 'color_hex'
 ]
 CONFIG_FILE = DATA_DIR / "config.ini" # MODIFIED: Use path in Application Support
+# History window for each time range filter; None means no lower bound
+TIME_RANGE_DELTAS = {
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "24h": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "all": None,
+}
+EARLIEST_TIME_UTC = datetime(MINYEAR, 1, 1, tzinfo=timezone.utc)
+EXPORT_BUFFER_SIZE = 1024 * 1024 # Write buffer for streamed chart-data exports
 
 # --- Global Variables / State ---
 aio_client = None
@@ -52,7 +97,18 @@ serial_thread = None
 stop_serial_event = threading.Event()
 window = None
 MAX_LOCAL_POINTS = 300 # Max points to load into memory/chart (even after filtering)
-local_data_store = deque(maxlen=MAX_LOCAL_POINTS)
+local_data_store = deque(maxlen=MAX_LOCAL_POINTS) # Recent samples as tuples in CSV_FIELDNAMES order
+upload_queue = queue.Queue(maxsize=8) # Samples waiting for AIO upload (oldest dropped when full)
+uploader_thread = None
+csv_file = None # Long-lived append handle for DATA_FILE (see append_to_csv)
+csv_writer = None
+csv_lock = threading.Lock()
+LOG_FLUSH_INTERVAL_SECONDS = 0.1 # UI log lines are batched for this long before being sent
+pending_logs = deque(maxlen=500) # (message, level) pairs waiting for the next flush
+pending_logs_lock = threading.Lock()
+log_flush_timer = None
+PERF_SAMPLE_SIZE = 256 # Recent call durations kept per timed Api endpoint
+endpoint_timings = defaultdict(lambda: deque(maxlen=PERF_SAMPLE_SIZE)) # endpoint name -> durations (ns)
 current_clue_interval = 30 # Default interval
 initial_aio_status_text = "Unknown"
 initial_aio_status_type = "info"
@@ -89,7 +145,9 @@ def initialize_aio_client():
     # print("DEBUG: Checking AIO_AVAILABLE...")
     if not AIO_AVAILABLE:
         # ... (handle missing lib)
-        return False, "Disabled (Lib Missing)"
+        initial_aio_status_text = "Disabled (Lib Missing)"
+        initial_aio_status_type = "warn"
+        return False, initial_aio_status_text, initial_aio_status_type
     # print("DEBUG: AIO_AVAILABLE is True")
 
     config = configparser.ConfigParser()
@@ -115,7 +173,7 @@ def initialize_aio_client():
                 logging.error(err_msg)
                 initial_aio_status_text = "Error (Create Config)"
                 initial_aio_status_type = "error"
-                return False, initial_aio_status_text
+                return False, initial_aio_status_text, initial_aio_status_type
             # --- End Create Default Config File ---
         else:
            # print("DEBUG: Config file found.")
@@ -136,10 +194,10 @@ def initialize_aio_client():
             logging.warning(err_msg)
             initial_aio_status_text = "Error (Bad config)"
             initial_aio_status_type = "error"
-            return False, initial_aio_status_text
+            return False, initial_aio_status_text, initial_aio_status_type
         # ... (rest of init)
         # print("DEBUG: Calling Client(aio_username, aio_key)...")
-        aio_client = Client(aio_username, aio_key)
+        aio_client = SessionClient(aio_username, aio_key)
         # print("DEBUG: Client(aio_username, aio_key) returned.")
 
         # Assume success (verification still commented out)
@@ -147,20 +205,20 @@ def initialize_aio_client():
         logging.info(f"Adafruit IO Client created for user '{aio_username}' (Verification skipped)." )
         initial_aio_status_text = status_text
         initial_aio_status_type = "success"
-        return True, status_text
+        return True, status_text, initial_aio_status_type
 
     except configparser.Error as e:
         # ... (logging)
         status_text = "Error (Config Parse)"
         initial_aio_status_text = status_text
         initial_aio_status_type = "error"
-        return False, status_text
+        return False, status_text, initial_aio_status_type
     except Exception as e:
         # ... (logging)
         status_text = "Error (Unknown)"
         initial_aio_status_text = status_text
         initial_aio_status_type = "error"
-        return False, status_text
+        return False, status_text, initial_aio_status_type
 
 # --- Adafruit IO Feed Mapping ---
 FEED_MAP = {
@@ -171,59 +229,127 @@ FEED_MAP = {
     "sound_level": "sound-level",
     "color_hex": "color-hex",
 }
+FEED_ITEMS = tuple(FEED_MAP.items()) # Fixed (sensor_key, feed_key) order used to build each upload
+AIO_GROUP_KEY = "default" # Group holding the FEED_MAP feeds (account default group)
+AIO_THROTTLE_BACKOFF_SECONDS = 2.2 # Pause after a ThrottlingError before continuing
 
 # --- CSV Handling Functions ---
 def append_to_csv(filepath, data_dict):
-    """Appends a row to the CSV file."""
+    """Appends a row to the CSV file (the file stays open between calls)."""
+    global csv_file, csv_writer
     try:
-        # Ensure file exists and has header if it's new/empty
-        file_exists = filepath.is_file()
-        is_empty = not file_exists or filepath.stat().st_size == 0
-
-        with open(filepath, 'a', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
-            if is_empty:
-                writer.writeheader()
-            writer.writerow(data_dict)
+        with csv_lock:
+            if csv_file is None or csv_file.name != str(filepath):
+                close_csv_file()
+                # Ensure file exists and has header if it's new/empty
+                csv_file = open(filepath, 'a', newline='', encoding='utf-8')
+                csv_writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
+                if csv_file.tell() == 0:
+                    csv_writer.writeheader()
+            csv_writer.writerow(data_dict)
+            csv_file.flush() # One write per row; keeps the file current for loads and exports
     except IOError as e:
         logging.error(f"Error appending to CSV file {filepath}: {e}")
         log_to_frontend(f"Error saving data to CSV: {e}", 'error')
+        with csv_lock:
+            close_csv_file() # Reopen on the next row
     except Exception as e:
         logging.exception(f"Unexpected error appending to CSV: {e}")
         log_to_frontend(f"Error saving data to CSV: {e}", 'error')
 
+def close_csv_file():
+    """Closes the persistent CSV handle, if open."""
+    global csv_file, csv_writer
+    if csv_file is not None:
+        try:
+            csv_file.close()
+        except IOError as e:
+            logging.error(f"Error closing CSV file: {e}")
+        csv_file = None
+        csv_writer = None
+
+def find_tail_offset(filepath, ts_index, start_time_utc):
+    """Binary-searches the CSV by byte offset for the last row older than start_time_utc.
+
+    Rows are appended in time order, so everything before the returned offset is older
+    still and readers can seek there instead of scanning from the top. Returns 0 if no
+    older row is found.
+    """
+    tail_offset = 0
+    with open(filepath, 'rb') as f:
+        low, high = 0, f.seek(0, os.SEEK_END)
+        while low < high:
+            probe = (low + high) // 2
+            f.seek(probe)
+            f.readline() # Skip the (possibly partial) line containing the probe offset
+            line_start = f.tell()
+            fields = f.readline().split(b',')
+            try:
+                record_time_utc = datetime.fromisoformat(fields[ts_index].decode('utf-8').strip())
+                if record_time_utc.tzinfo is None: record_time_utc = record_time_utc.replace(tzinfo=timezone.utc)
+                is_older = record_time_utc < start_time_utc
+            except (ValueError, IndexError, UnicodeDecodeError):
+                is_older = False # EOF, header or damaged row: search earlier, which only widens the scan
+            if is_older:
+                tail_offset = line_start
+                low = probe + 1
+            else:
+                high = probe
+    return tail_offset
+
+def time_range_start(time_range_filter):
+    """Returns (start_time_utc, bounded) for a time range filter; unknown filters fall back to 1h."""
+    range_delta = TIME_RANGE_DELTAS.get(time_range_filter, TIME_RANGE_DELTAS["1h"])
+    if range_delta is None:
+        return EARLIEST_TIME_UTC, False
+    return datetime.now(timezone.utc) - range_delta, True
+
+def iter_rows_in_range(filepath, start_time_utc, seek_to_tail=True):
+    """Yields the CSV header, then each row (list of strings) recorded at or after start_time_utc.
+
+    Only gw_timestamp is parsed per row. Yields nothing if the file is missing, empty,
+    or has no gw_timestamp column.
+    """
+    if not filepath.is_file() or filepath.stat().st_size == 0:
+        logging.info(f"Data file {filepath} not found or empty.")
+        return
+    with open(filepath, 'r', newline='', encoding='utf-8') as csvfile:
+        header = next(csv.reader([csvfile.readline()]), [])
+        if 'gw_timestamp' not in header:
+            logging.warning(f"Data file {filepath} has no gw_timestamp column; nothing loaded.")
+            return
+        yield header
+        ts_index = header.index('gw_timestamp')
+        if seek_to_tail:
+            # Rows are appended in time order: skip straight to the tail that can match
+            tail_offset = find_tail_offset(filepath, ts_index, start_time_utc)
+            if tail_offset > csvfile.tell():
+                csvfile.seek(tail_offset)
+        for row in csv.reader(csvfile):
+            if not row:
+                continue # Blank line (DictReader skipped these too)
+            try:
+                record_time_utc = datetime.fromisoformat(row[ts_index])
+                if record_time_utc.tzinfo is None: record_time_utc = record_time_utc.replace(tzinfo=timezone.utc)
+            except (ValueError, IndexError, TypeError) as e:
+                 logging.warning(f"Skipping CSV row due to parse error ({row!r}): {e}")
+                 continue
+            if record_time_utc >= start_time_utc:
+                yield row
+
 def load_initial_data(filepath, max_points, time_range_filter="1h"):
     # Note: max_points argument is now ignored here, but kept for potential future use elsewhere
     loaded_data = []
-    start_time_utc = None
-    now_utc = datetime.now(timezone.utc)
-
-    # Calculate start time based on filter
-    if time_range_filter == "1h": start_time_utc = now_utc - timedelta(hours=1)
-    elif time_range_filter == "6h": start_time_utc = now_utc - timedelta(hours=6)
-    elif time_range_filter == "24h": start_time_utc = now_utc - timedelta(days=1)
-    elif time_range_filter == "7d": start_time_utc = now_utc - timedelta(days=7)
-    elif time_range_filter == "30d": start_time_utc = now_utc - timedelta(days=30)
-    elif time_range_filter == "all": start_time_utc = datetime(MINYEAR, 1, 1, tzinfo=timezone.utc)
-    else: start_time_utc = now_utc - timedelta(hours=1)
+    start_time_utc, bounded = time_range_start(time_range_filter)
 
     logging.info(f"Loading data from {filepath} since {start_time_utc} (filter: {time_range_filter})" )
 
     try:
-        if filepath.is_file() and filepath.stat().st_size > 0:
-            with open(filepath, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    try:
-                        record_time_utc = datetime.fromisoformat(row['gw_timestamp'])
-                        if record_time_utc.tzinfo is None: record_time_utc = record_time_utc.replace(tzinfo=timezone.utc)
-                        if record_time_utc >= start_time_utc:
-                            loaded_data.append(row)
-                    except (ValueError, KeyError, TypeError) as e:
-                         logging.warning(f"Skipping CSV row due to parse error ('{row.get('gw_timestamp')}'): {e}")
-                         continue
-        else:
-            logging.info(f"Data file {filepath} not found or empty.")
+        rows = iter_rows_in_range(filepath, start_time_utc, seek_to_tail=bounded)
+        header = next(rows, None)
+        if header is not None:
+            # Dicts are built only for rows inside the range
+            loaded_data.extend(dict(zip(header, row)) for row in rows)
     except Exception as e:
         logging.exception(f"Error reading or filtering data from CSV {filepath}: {e}")
         log_to_frontend(f"Error loading previous data: {e}", 'error')
@@ -236,12 +362,67 @@ def load_initial_data(filepath, max_points, time_range_filter="1h"):
     return loaded_data
 
 # --- Helper Functions for Backend ---
+def parse_csv_number(value, number_type):
+    """Converts a CSV field with number_type (float/int); None for empty or invalid values."""
+    if value is None or value == '':
+        return None
+    try:
+        return number_type(value)
+    except (ValueError, TypeError):
+        return None
+
+def json_loads(text):
+    """Parses JSON with orjson when available (raises json.JSONDecodeError either way)."""
+    return orjson.loads(text) if orjson else json.loads(text)
+
+def json_dumps(obj):
+    """Serializes to a JSON str with orjson when available."""
+    return orjson.dumps(obj).decode('utf-8') if orjson else json.dumps(obj)
+
+@contextlib.contextmanager
+def timed_section(name):
+    """Records the duration of the enclosed block in endpoint_timings under name."""
+    start_ns = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        endpoint_timings[name].append(time.perf_counter_ns() - start_ns)
+
+def timed(fn):
+    """Records each call's duration in endpoint_timings (reported by Api.get_perf_stats)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with timed_section(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
 def log_to_frontend(message, level='info'):
-    global window
+    """Queues a log line for the UI; queued lines are sent together by flush_logs_to_frontend."""
+    global window, log_flush_timer
+    if not window:
+        return
+    with pending_logs_lock:
+        pending_logs.append((message, level))
+        if log_flush_timer is None:
+            log_flush_timer = threading.Timer(LOG_FLUSH_INTERVAL_SECONDS, flush_logs_to_frontend)
+            log_flush_timer.daemon = True
+            log_flush_timer.start()
+
+def flush_logs_to_frontend():
+    """Sends all queued log lines to the UI in a single evaluate_js call."""
+    global window, log_flush_timer
+    with pending_logs_lock:
+        entries = list(pending_logs)
+        pending_logs.clear()
+        log_flush_timer = None
     try:
-        escaped_message = message.replace('\\', '\\\\').replace('`', '\\`').replace('\n', '\\n')
-        if window:
-            window.evaluate_js(f"addLogMessage(`{escaped_message}`, '{level}');")
+        if window and entries:
+            window.evaluate_js(f"addLogBatch({json_dumps(entries)});")
     except Exception as e:
         logging.error(f"Error logging to frontend: {e}")
 
@@ -260,7 +441,7 @@ def update_status(status_text, status_type='info'):
     log_to_frontend(f"Status changed: {status_text}", status_type)
     try:
         if window:
-            window.evaluate_js(f"updateStatus(`{status_text}`, '{status_type}');")
+            window.evaluate_js(f"updateStatus({json.dumps(status_text)}, {json.dumps(status_type)});")
     except Exception as e:
         logging.error(f"Error updating status: {e}")
 
@@ -270,55 +451,72 @@ def upload_to_aio(data_dict):
         # Status already set during init if failed
         # log_to_frontend("Adafruit IO not available/initialized. Skipping upload.", 'warn')
         return False
+    if stop_serial_event.is_set():
+        log_to_frontend("Upload aborted (stop event).", 'warn')
+        return False
 
-    # Revert to individual uploads with delay
-    log_to_frontend("Attempting to upload data to Adafruit IO (individual feeds)...", 'info')
-    success_count = 0
-    fail_count = 0
-    rate_limit_delay = 1.1 # Delay between sends to avoid rate limits
-    all_success = True # Track overall success
-
-    for sensor_key, feed_key in FEED_MAP.items():
-        if stop_serial_event.is_set():
-             log_to_frontend("Upload aborted (stop event).", 'warn')
-             return False # Stop the whole process
-        if sensor_key in data_dict and data_dict[sensor_key] is not None:
-            value = data_dict[sensor_key]
+    # Send every available feed value in one group request instead of one request per feed
+    feeds = [
+        {'key': feed_key, 'value': data_dict[sensor_key]}
+        for sensor_key, feed_key in FEED_ITEMS
+        if data_dict.get(sensor_key) is not None
+    ]
+    if not feeds:
+        return True
+
+    log_to_frontend(f"Uploading {len(feeds)} feeds to Adafruit IO (group '{AIO_GROUP_KEY}')...", 'info')
+    set_aio_status(f"Sending {len(feeds)} feeds...", 'info')
+    try:
+        # Client has no public group-data call; _post handles auth and error mapping
+        aio_client._post(f"groups/{AIO_GROUP_KEY}/data", {'feeds': feeds})
+    except ThrottlingError: # Catch specific throttling error
+        log_to_frontend("     ...AIO ThrottlingError for group upload", 'warn')
+        logging.warning(f"Adafruit IO ThrottlingError for group {AIO_GROUP_KEY}")
+        set_aio_status("Throttled", 'warn')
+        time.sleep(AIO_THROTTLE_BACKOFF_SECONDS) # Back off before the next sample
+        return False
+    except RequestError as e:
+        log_to_frontend(f"     ...AIO RequestError for group upload: {e}", 'error')
+        logging.error(f"Adafruit IO RequestError for group {AIO_GROUP_KEY}: {e}")
+        set_aio_status("Error (Req)", 'error')
+        return False
+    except Exception as e:
+        log_to_frontend(f"     ...Error sending group upload: {e}", 'error')
+        logging.exception(f"Upload exception for group {AIO_GROUP_KEY}")
+        set_aio_status("Error (Send)", 'error')
+        return False
+
+    log_to_frontend(f"Upload finished. Sent {len(feeds)} feeds.", 'info')
+    set_aio_status("OK (Idle)", 'success')
+    return True
+
+def queue_aio_upload(data_dict):
+    """Hands a sample to the uploader thread, dropping the oldest queued sample if full."""
+    if not aio_client:
+        return
+    while True:
+        try:
+            upload_queue.put_nowait(data_dict)
+            return
+        except queue.Full:
             try:
-                set_aio_status(f"Sending {feed_key}...", 'info') # Indicate sending
-                aio_client.send_data(feed_key, value)
-                set_aio_status(f"OK ({feed_key})", 'success') # Indicate success for this feed
-                success_count += 1
-                time.sleep(rate_limit_delay)
-            except ThrottlingError: # Catch specific throttling error
-                log_to_frontend(f"     ...AIO ThrottlingError for '{feed_key}'", 'warn')
-                logging.warning(f"Adafruit IO ThrottlingError for {feed_key}")
-                set_aio_status(f"Throttled ({feed_key})", 'warn') # Specific status
-                fail_count += 1
-                all_success = False
-                time.sleep(rate_limit_delay * 2) # Wait longer after throttle
-            except RequestError as e:
-                log_to_frontend(f"     ...AIO RequestError for '{feed_key}': {e}", 'error')
-                logging.error(f"Adafruit IO RequestError for {feed_key}: {e}")
-                set_aio_status(f"Error ({feed_key}: Req)", 'error') # Indicate request error
-                fail_count += 1
-                all_success = False
-            except Exception as e:
-                log_to_frontend(f"     ...Error sending to '{feed_key}': {e}", 'error')
-                logging.exception(f"Upload exception for {feed_key}")
-                set_aio_status(f"Error ({feed_key}: Send)", 'error') # Indicate other send error
-                fail_count += 1
-                all_success = False
-
-    log_to_frontend(f"Upload attempt finished. Success: {success_count}, Failed: {fail_count}", 'info')
-    # Set final status after loop if needed (e.g., if last status was an error)
-    if fail_count > 0:
-        set_aio_status("Finished (with errors)", 'warn')
-    elif success_count > 0 :
-        set_aio_status("OK (Idle)", 'success')
-    # Else status remains from the last operation
-
-    return all_success # Return True only if ALL sends succeeded
+                upload_queue.get_nowait()
+                logging.warning("AIO upload queue full; dropped oldest sample.")
+            except queue.Empty:
+                pass
+
+def uploader_worker():
+    """Uploads queued samples so network I/O never blocks the serial worker."""
+    logging.info("AIO uploader thread started.")
+    while True:
+        data_dict = upload_queue.get()
+        if data_dict is None: # Sentinel from shutdown
+            break
+        try:
+            upload_to_aio(data_dict)
+        except Exception:
+            logging.exception("Unexpected error in AIO uploader thread")
+    logging.info("AIO uploader thread finished.")
 
 # --- Serial Worker Thread ---
 def serial_worker(port):
@@ -336,14 +534,17 @@ def serial_worker(port):
         if window: window.evaluate_js(f"setConnectionState(true);")
         serial_connection = ser
 
+        read_buffer = bytearray() # Bytes read from the port but not yet split into lines
         while not stop_serial_event.is_set():
             line_bytes = None
             try:
-                if ser.in_waiting > 0:
-                    line_bytes = ser.readline()
-                else:
-                    time.sleep(0.1)
+                newline_index = read_buffer.find(b'\n')
+                if newline_index < 0:
+                    # Take everything waiting in one call; when idle, block up to the port timeout
+                    read_buffer.extend(ser.read(ser.in_waiting or 1))
                     continue
+                line_bytes = bytes(read_buffer[:newline_index + 1])
+                del read_buffer[:newline_index + 1]
             except serial.SerialException as read_err:
                  logging.error(f"Serial error during read on {port}: {read_err}")
                  log_to_frontend(f"[Worker] Serial read error: {read_err}", 'error')
@@ -355,17 +556,14 @@ def serial_worker(port):
                     line_str = line_bytes.decode('utf-8', errors='ignore').strip()
                     if line_str:
                         try:
-                            sensor_data = json.loads(line_str)
+                            sensor_data = json_loads(line_str)
                             if isinstance(sensor_data, dict) and "timestamp_monotonic" in sensor_data:
                                 log_to_frontend(f"Received valid sensor JSON.", 'info')
 
                                 # --- BEGIN MOVED CONVERSION ---
-                                if "temperature_sht" in sensor_data and sensor_data["temperature_sht"] is not None:
+                                if sensor_data.get("temperature_sht") is not None:
                                     try:
-                                        celsius = sensor_data["temperature_sht"]
-                                        fahrenheit = (celsius * 9/5) + 32
-                                        sensor_data["temperature_sht"] = round(fahrenheit, 2) # Update the dict directly
-                                        log_to_frontend(f"Converted temp: {celsius}°C -> {sensor_data['temperature_sht']}°F", 'debug')
+                                        sensor_data["temperature_sht"] = round(sensor_data["temperature_sht"] * 9/5 + 32, 2) # Update the dict directly
                                     except Exception as e:
                                         log_to_frontend(f"Error converting temperature: {e}", 'error')
                                         logging.error(f"Error converting temp: {e} for value {sensor_data['temperature_sht']}")
@@ -376,7 +574,7 @@ def serial_worker(port):
                                 sensor_data['gw_timestamp'] = gw_timestamp # Add timestamp
 
                                 # Add to local storage (NOW WITH FAHRENHEIT)
-                                local_data_store.append(sensor_data.copy()) # Append a copy
+                                local_data_store.append(tuple(sensor_data.get(field) for field in CSV_FIELDNAMES))
 
                                 # Append to persistent CSV storage (NOW WITH FAHRENHEIT)
                                 append_to_csv(DATA_FILE, sensor_data)
@@ -398,16 +596,14 @@ def serial_worker(port):
                                             'sound_level': sensor_data.get('sound_level'),
                                             'color_hex': sensor_data.get('color_hex')
                                         }
-                                        # Convert to JSON string to pass to JS
-                                        chart_data_json = json.dumps(chart_data_point)
-                                        # Escape potentially problematic chars in JSON string for JS eval
-                                        escaped_chart_data = chart_data_json.replace('\\', '\\\\').replace('`', '\\`')
-                                        window.evaluate_js(f'updateChart(`{escaped_chart_data}`);')
+                                        # Convert to JSON string, then encode that string as a JS string literal
+                                        chart_data_json = json_dumps(chart_data_point)
+                                        window.evaluate_js(f'updateChart({json.dumps(chart_data_json)});')
                                     except Exception as chart_err:
                                          logging.error(f"Error calling updateChart in JS: {chart_err}")
 
-                                # Trigger AIO upload (NOW WITH FAHRENHEIT)
-                                upload_to_aio(sensor_data)
+                                # Queue AIO upload (NOW WITH FAHRENHEIT)
+                                queue_aio_upload(sensor_data)
 
                         except json.JSONDecodeError:
                             logging.debug(f"Ignoring non-JSON line: {line_str}")
@@ -471,10 +667,15 @@ class Api:
         return {'success': True, 'message': 'Connection process started'}
 
     def disconnect(self):
-        global serial_thread, stop_serial_event
+        global serial_thread, stop_serial_event, serial_connection
         log_to_frontend("Disconnect requested.", 'info')
         if serial_thread and serial_thread.is_alive():
             stop_serial_event.set()
+            try:
+                if serial_connection:
+                    serial_connection.cancel_read() # Wake the worker's blocking read immediately
+            except Exception as e:
+                logging.debug(f"cancel_read not available: {e}")
             return {'success': True, 'message': 'Disconnect signal sent'}
         else:
             log_to_frontend("Not currently connected.", 'warn')
@@ -518,31 +719,20 @@ class Api:
             logging.exception("Error sending interval command")
             return {'success': False, 'message': 'Unexpected error'}
 
+    @timed
     def get_initial_chart_data(self, time_range_filter="1h"):
         # Load data based on the requested filter - this returns a LIST
         logging.info(f"API: Loading initial data with filter: {time_range_filter}")
         initial_records_list = load_initial_data(DATA_FILE, MAX_LOCAL_POINTS, time_range_filter)
 
         logging.debug(f"JS requested initial chart data. Processing {len(initial_records_list)} records from list." )
-        # Format data for the Chart
-        labels = []
-        temp_data = []
-        humidity_data = []
-        pressure_data = []
-        light_data = []
-        sound_data = []
-        for data_point in initial_records_list:
-            labels.append(data_point.get('gw_timestamp', ''))
-            try: temp_data.append(float(data_point['temperature_sht']) if data_point.get('temperature_sht') not in [None, ''] else None)
-            except (ValueError, TypeError): temp_data.append(None)
-            try: humidity_data.append(float(data_point['humidity']) if data_point.get('humidity') not in [None, ''] else None)
-            except (ValueError, TypeError): humidity_data.append(None)
-            try: pressure_data.append(float(data_point['pressure']) if data_point.get('pressure') not in [None, ''] else None)
-            except (ValueError, TypeError): pressure_data.append(None)
-            try: light_data.append(int(data_point['light']) if data_point.get('light') not in [None, ''] else None)
-            except (ValueError, TypeError): light_data.append(None)
-            try: sound_data.append(int(data_point['sound_level']) if data_point.get('sound_level') not in [None, ''] else None)
-            except (ValueError, TypeError): sound_data.append(None)
+        # Format data for the Chart (one pass per column)
+        labels = [data_point.get('gw_timestamp', '') for data_point in initial_records_list]
+        temp_data = [parse_csv_number(data_point.get('temperature_sht'), float) for data_point in initial_records_list]
+        humidity_data = [parse_csv_number(data_point.get('humidity'), float) for data_point in initial_records_list]
+        pressure_data = [parse_csv_number(data_point.get('pressure'), float) for data_point in initial_records_list]
+        light_data = [parse_csv_number(data_point.get('light'), int) for data_point in initial_records_list]
+        sound_data = [parse_csv_number(data_point.get('sound_level'), int) for data_point in initial_records_list]
 
         # Return BOTH the chart-formatted data and the original raw data list
         chart_data = {
@@ -572,17 +762,33 @@ class Api:
             "aio_status_type": initial_aio_status_type
         }
 
+    def get_perf_stats(self):
+        """Returns call count and p50/p95 duration (ms) over recent calls of each timed endpoint."""
+        stats = {}
+        for name, durations in list(endpoint_timings.items()):
+            samples = sorted(durations.copy()) # Snapshot first; timed_section may append from another thread
+            if not samples:
+                continue
+            stats[name] = {
+                'calls': len(samples),
+                'p50_ms': percentile(samples, 0.50) / 1e6,
+                'p95_ms': percentile(samples, 0.95) / 1e6,
+            }
+        return stats
+
     # --- MODIFIED EXPORT METHOD ---
     def export_chart_data(self, time_range_filter="1h"): # Accept filter
         """Exports the data corresponding to the currently selected time range."""
-        global window, DATA_FILE, MAX_LOCAL_POINTS # MAX_LOCAL_POINTS is ignored by load_initial_data
+        global window, DATA_FILE
         log_to_frontend(f"Export chart data requested (Range: {time_range_filter})...", 'info')
 
+        # Rows are streamed from the history file to the export file, never held in memory as a list
+        start_time_utc, bounded = time_range_start(time_range_filter)
+        rows = iter_rows_in_range(DATA_FILE, start_time_utc, seek_to_tail=bounded)
         try:
-            # Load the data for the specified range, similar to get_initial_chart_data
-            data_to_export = load_initial_data(DATA_FILE, MAX_LOCAL_POINTS, time_range_filter)
-
-            if not data_to_export:
+            header = next(rows, None)
+            first_row = next(rows, None) if header is not None else None
+            if first_row is None:
                  log_to_frontend(f"No data found for time range '{time_range_filter}' to export.", 'warn')
                  return {"success": False, "message": "No data available for selected range"}
 
@@ -594,13 +800,18 @@ class Api:
                 save_path = result[0] if isinstance(result, (list, tuple)) else result
                 log_to_frontend(f"Saving chart data ({time_range_filter}) to: {save_path}", 'info')
                 try:
-                    with open(save_path, 'w', newline='', encoding='utf-8') as csvfile:
-                        # Use defined fieldnames for consistency
-                        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
-                        writer.writeheader()
-                        writer.writerows(data_to_export) # Write the list of dicts
-                    log_to_frontend(f"Successfully exported {len(data_to_export)} points for range '{time_range_filter}'.", 'success')
-                    return {"success": True, "message": f"Exported {len(data_to_export)} points to {save_path}"}
+                    # Use defined fieldnames for consistency; fields missing from the source are left empty
+                    column_indexes = [header.index(field) if field in header else None for field in CSV_FIELDNAMES]
+                    exported_count = 0
+                    # Timed from here on so the save dialog isn't counted
+                    with timed_section('export_chart_data'), open(save_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as csvfile:
+                        writer = csv.writer(csvfile)
+                        writer.writerow(CSV_FIELDNAMES)
+                        for row in itertools.chain((first_row,), rows):
+                            writer.writerow([row[i] if i is not None and i < len(row) else '' for i in column_indexes])
+                            exported_count += 1
+                    log_to_frontend(f"Successfully exported {exported_count} points for range '{time_range_filter}'.", 'success')
+                    return {"success": True, "message": f"Exported {exported_count} points to {save_path}"}
                 except Exception as e:
                     log_to_frontend(f"Error writing export file: {e}", 'error')
                     logging.exception(f"Error writing export file {save_path}")
@@ -613,13 +824,19 @@ class Api:
             log_to_frontend(f"Error preparing chart data for export: {e}", 'error')
             logging.exception("Error preparing chart data export")
             return {"success": False, "message": f"Error: {e}"}
+        finally:
+            rows.close() # Release the history file even on early return
 
     def export_all_data(self):
         """Exports the entire contents of the main sensor_data.csv file."""
         global window, DATA_FILE
         log_to_frontend("Export all history requested...", 'info')
 
-        if not DATA_FILE.is_file() or DATA_FILE.stat().st_size == 0:
+        try:
+            data_file_size = DATA_FILE.stat().st_size
+        except FileNotFoundError:
+            data_file_size = 0
+        if data_file_size == 0:
             log_to_frontend("No history data file found or file is empty.", 'warn')
             return {"success": False, "message": "No history data available"}
 
@@ -632,9 +849,9 @@ class Api:
                 save_path = result[0] if isinstance(result, (list, tuple)) else result
                 log_to_frontend(f"Exporting full history from {DATA_FILE} to {save_path}", 'info')
                 try:
-                    # Simple file copy might be fastest for large files
-                    import shutil
-                    shutil.copyfile(DATA_FILE, save_path)
+                    # shutil.copyfile already takes the kernel fast path (fcopyfile on macOS, sendfile on Linux)
+                    with timed_section('export_all_data'): # Copy only; the save dialog isn't counted
+                        shutil.copyfile(DATA_FILE, save_path)
                     # Could also read/write row by row if transformation needed
                     log_to_frontend(f"Successfully exported full history.", 'success')
                     return {"success": True, "message": f"Full history exported to {save_path}"}
@@ -687,17 +904,23 @@ if __name__ == '__main__':
         sys.exit(1)
 
     # print("DEBUG: Calling initialize_aio_client() AFTER window creation...")
-    aio_init_success, aio_final_status_text = initialize_aio_client()
+    aio_init_success, aio_final_status_text, aio_final_status_type = initialize_aio_client()
     # print(f"DEBUG: initialize_aio_client() finished. Stored AIO Status: {initial_aio_status_text}")
     # print(f"DEBUG: Setting final AIO status UI before webview.start(): {aio_final_status_text}")
-    status_type = 'success' if aio_init_success else 'error' if "Error" in aio_final_status_text else 'warn'
-    set_aio_status(aio_final_status_text, status_type)
+    set_aio_status(aio_final_status_text, aio_final_status_type)
+    if aio_init_success:
+        uploader_thread = threading.Thread(target=uploader_worker, daemon=True, name="AioUploader")
+        uploader_thread.start()
     # print("DEBUG: Final AIO status set.")
 
     def on_closing():
         logging.info("Window closing signal received.")
         # print("DEBUG: On closing called.")
         api.disconnect()
+        if uploader_thread and uploader_thread.is_alive():
+            queue_aio_upload(None) # Sentinel stops the uploader
+        with csv_lock:
+            close_csv_file()
 
     try:
         # print("DEBUG: Calling webview.start()...")
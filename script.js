@@ -377,6 +377,19 @@ function addLogMessage(message, level = 'info') {
     logArea.scrollTop = logArea.scrollHeight;
 }
 
+// Called from Python with [[message, level], ...] batched since the last flush
+function addLogBatch(entries) {
+    const fragment = document.createDocumentFragment();
+    for (const [message, level] of entries) {
+        const p = document.createElement('p');
+        p.textContent = message;
+        p.className = level || 'info';
+        fragment.appendChild(p);
+    }
+    logArea.appendChild(fragment);
+    logArea.scrollTop = logArea.scrollHeight;
+}
+
 function updateStatus(statusText, statusType = 'info') {
     statusBarText.textContent = `Status: ${statusText}`; // Update only the text part
     statusBar.className = 'status-bar'; // Reset classes